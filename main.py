@@ -1,19 +1,37 @@
+import functools
 import traceback
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from websockets.exceptions import ConnectionClosed
-from urllib.parse import urlparse, parse_qs
-import base64
+# pybase64 is a SIMD-accelerated drop-in for the stdlib base64 module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 import json
 import asyncio
 from pathlib import Path
-from typing import Dict, Set
+from typing import Dict, Iterator, List, Set
 import logging
 from pydub import AudioSegment
 import io
+import wave
 import uvicorn
 import os
 
+# audioop provides the G.711 mu-law encoder (removed from the stdlib in
+# Python 3.13, where the audioop-lts package supplies it)
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+# lameenc encodes MP3 in-process, without spawning ffmpeg
+try:
+    import lameenc
+except ImportError:
+    lameenc = None
+
 app = FastAPI()
 
 # Get the project root directory
@@ -25,16 +43,47 @@ WAV_MONO = os.path.join(PROJECT_ROOT, "audio", "10_mono.wav")
 SAMPLE_RATE = 8000
 BYTE_PER_SAMPLE = 2
 CHANNELS = 1
-FRAME_SAMPLES = 1152  # One MP3 frame contains 1152 samples
-FRAME_MS = int((FRAME_SAMPLES / SAMPLE_RATE) * 1000)  # ~144ms per frame
+FRAME_SAMPLES = 576  # One MPEG 2.5 Layer III frame (used at 8kHz) contains 576 samples
+FRAME_MS = int((FRAME_SAMPLES / SAMPLE_RATE) * 1000)  # 72ms per frame
+
+# Streamed codec: "mp3" or "ulaw" (G.711 mu-law, one byte per sample)
+AUDIO_FORMAT = os.environ.get("AUDIO_FORMAT", "mp3")
+ULAW_FRAME_MS = 20  # Usual VoIP packet duration
+ULAW_FRAME_BYTES = SAMPLE_RATE * ULAW_FRAME_MS // 1000  # 160 bytes per frame
+
+# MPEG audio Layer III header tables, keyed by the header's version bits
+# (3 = MPEG 1, 2 = MPEG 2, 0 = MPEG 2.5)
+MP3_BITRATES_KBPS = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+# WebSocket send method for each payload data type
+SEND_METHODS = {
+    "binary": "send_bytes",
+    "json": "send_json",
+    "text": "send_text",
+}
+
+# Payloads buffered per client before the oldest ones are dropped
+CLIENT_QUEUE_SIZE = 32
 
 # Global state
-clients: Set[WebSocket] = set()
+clients: Dict[WebSocket, asyncio.Queue] = {}
 servers: Set[WebSocket] = set()
 pcm_data: bytes = None
 offset: int = 0
 send_task: asyncio.Task = None
 
+# Serialized chunk messages for WAV_MONO, built once at startup
+PRECOMPUTED_FRAMES: List[str] = []
+
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,120 +102,234 @@ def base64_to_bytes(base64_str: str) -> bytes:
     """Convert base64 string to bytes."""
     return base64.b64decode(base64_str)
 
+async def pump_client(websocket: WebSocket, queue: asyncio.Queue):
+    """Drain a client's queue to its socket, so a slow client does not hold up the others."""
+    try:
+        while True:
+            send, payload = await queue.get()
+            await getattr(websocket, send)(payload)
+    except (WebSocketDisconnect, ConnectionClosed):
+        clients.pop(websocket, None)
+        logger.error("Client disconnected during send")
+    except Exception as e:
+        clients.pop(websocket, None)
+        logger.error(f"Error sending to client: {e}")
+
 async def send_payload_to_clients(payload: bytes | str | dict, data_type="text"):
-    """Send payload to all connected clients."""
-    for client in clients.copy():
-        try:
-            if data_type == "binary":
-                await client.send_bytes(payload)
-            if data_type == "json":
-                await client.send_json(payload)
-            if data_type == "text":
-                await client.send_text(payload)
-        except (WebSocketDisconnect, ConnectionClosed):
-            clients.discard(client)
-            logger.error("Client disconnected during send")
+    """Queue payload for all connected clients."""
+    item = (SEND_METHODS[data_type], payload)
+    for queue in tuple(clients.values()):
+        # Drop the oldest payload instead of waiting for a slow client
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
 
-async def send_chunks():
-    """
-    Process and send audio chunks to clients, one MP3 frame per chunk.
-    """
-    try:
-        # Read and convert the WAV file
-        audio_segment = AudioSegment.from_wav(WAV_MONO)
+# A stream repeats a handful of distinct headers, so decode each one only once
+@functools.lru_cache(maxsize=256)
+def mp3_frame_length(header: int) -> int:
+    """Return the byte length of the Layer III frame starting with this header, or 0 if invalid."""
+    if header >> 21 != 0x7FF:
+        return 0
+    version = (header >> 19) & 0x3
+    layer = (header >> 17) & 0x3
+    bitrate_index = (header >> 12) & 0xF
+    sample_rate_index = (header >> 10) & 0x3
+    padding = (header >> 9) & 0x1
+    if version not in MP3_BITRATES_KBPS or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return 0
+    bitrate = MP3_BITRATES_KBPS[version][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    # MPEG 2 and 2.5 frames carry half as many samples as MPEG 1 frames
+    coefficient = 144 if version == 3 else 72
+    return coefficient * bitrate // sample_rate + padding
+
+def iter_mp3_frames(mp3_data: bytes) -> Iterator[memoryview]:
+    """Yield each MPEG Layer III frame in mp3_data as a memoryview, without copying."""
+    mp3_view = memoryview(mp3_data)
+    position = 0
+    
+    # Skip a leading ID3v2 tag, its body can contain bytes that look like a sync word
+    if len(mp3_data) >= 10 and mp3_data[:3] == b'ID3':
+        tag_size = ((mp3_data[6] & 0x7F) << 21 | (mp3_data[7] & 0x7F) << 14 |
+                    (mp3_data[8] & 0x7F) << 7 | (mp3_data[9] & 0x7F))
+        position = 10 + tag_size + (10 if mp3_data[5] & 0x10 else 0)
+    
+    while position + 4 <= len(mp3_data):
+        frame_length = mp3_frame_length(int.from_bytes(mp3_view[position:position + 4], 'big'))
         
-        # Log total audio information
-        total_duration = len(audio_segment) / 1000.0  # Convert milliseconds to seconds
-        logger.info(f"Total audio file:")
-        logger.info(f"  - Duration: {total_duration:.3f} seconds")
+        # Not a frame header: jump to the next possible sync byte
+        if frame_length == 0:
+            position = mp3_data.find(b'\xff', position + 1)
+            if position < 0:
+                break
+            continue
         
-        # Convert entire file to MP3 once
-        buffer = io.BytesIO()
-        audio_segment.export(
-            buffer,
-            format='mp3',
-            bitrate='8k',
-            parameters=[
-                "-ac", str(CHANNELS),
-                "-ar", str(SAMPLE_RATE)
-            ]
-        )
-        mp3_data = buffer.getvalue()
+        # Drop a truncated last frame, it cannot be decoded
+        if position + frame_length > len(mp3_data):
+            break
+            
+        yield mp3_view[position:position + frame_length]
+        position += frame_length
+
+def iter_ulaw_frames(ulaw_data: bytes) -> Iterator[memoryview]:
+    """Yield fixed ULAW_FRAME_BYTES frames of mu-law data as memoryviews, without copying."""
+    ulaw_view = memoryview(ulaw_data)
+    for i in range(0, len(ulaw_data), ULAW_FRAME_BYTES):
+        yield ulaw_view[i:i + ULAW_FRAME_BYTES]
+
+def build_chunk_message(frame_data: bytes | memoryview) -> str:
+    """Build the serialized chunk event for one audio frame."""
+    message = {
+        "event": "chunk",
+        "media": {
+            "payload": base64.b64encode(frame_data).decode('ascii'),
+            "is_sync": True
+        }
+    }
+    # Same compact encoding as WebSocket.send_json, done once per frame
+    return json.dumps(message, separators=(",", ":"))
+
+def encode_wav_to_mp3(wav_path: str) -> bytes:
+    """
+    Encode a WAV file to 8kbps MP3 at SAMPLE_RATE and CHANNELS.
+    
+    WAV files already in the target PCM layout are encoded in-process with
+    lameenc; anything else goes through pydub, which shells out to ffmpeg.
+    """
+    if lameenc is not None:
+        with wave.open(wav_path, 'rb') as wav:
+            pcm_data = None
+            if (wav.getframerate() == SAMPLE_RATE and
+                    wav.getnchannels() == CHANNELS and
+                    wav.getsampwidth() == BYTE_PER_SAMPLE):
+                pcm_data = wav.readframes(wav.getnframes())
         
+        if pcm_data is not None:
+            total_duration = len(pcm_data) / (SAMPLE_RATE * BYTE_PER_SAMPLE * CHANNELS)
+            logger.info(f"Total audio file:")
+            logger.info(f"  - Duration: {total_duration:.3f} seconds")
+            
+            encoder = lameenc.Encoder()
+            encoder.set_bit_rate(8)
+            encoder.set_in_sample_rate(SAMPLE_RATE)
+            encoder.set_channels(CHANNELS)
+            encoder.set_quality(7)
+            return bytes(encoder.encode(pcm_data) + encoder.flush())
+    
+    # Read and convert the WAV file
+    audio_segment = AudioSegment.from_wav(wav_path)
+    
+    # Log total audio information
+    total_duration = len(audio_segment) / 1000.0  # Convert milliseconds to seconds
+    logger.info(f"Total audio file:")
+    logger.info(f"  - Duration: {total_duration:.3f} seconds")
+    
+    # Convert entire file to MP3 once
+    buffer = io.BytesIO()
+    audio_segment.export(
+        buffer,
+        format='mp3',
+        bitrate='8k',
+        parameters=[
+            "-ac", str(CHANNELS),
+            "-ar", str(SAMPLE_RATE)
+        ]
+    )
+    return buffer.getvalue()
+
+def encode_wav_to_ulaw(wav_path: str) -> bytes:
+    """
+    Encode a WAV file to G.711 mu-law at SAMPLE_RATE, mono.
+    """
+    if audioop is None:
+        raise RuntimeError("audioop is not available, install audioop-lts to stream mu-law")
+    
+    with wave.open(wav_path, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        frame_rate = wav.getframerate()
+        pcm_data = wav.readframes(wav.getnframes())
+    
+    # Bring the PCM data to signed 16-bit mono at SAMPLE_RATE
+    if sample_width == 1:
+        pcm_data = audioop.bias(pcm_data, 1, -128)  # 8-bit WAV samples are unsigned
+    if sample_width != BYTE_PER_SAMPLE:
+        pcm_data = audioop.lin2lin(pcm_data, sample_width, BYTE_PER_SAMPLE)
+    if channels == 2:
+        pcm_data = audioop.tomono(pcm_data, BYTE_PER_SAMPLE, 0.5, 0.5)
+    elif channels != 1:
+        raise ValueError(f"Unsupported channel count: {channels}")
+    if frame_rate != SAMPLE_RATE:
+        pcm_data, _ = audioop.ratecv(pcm_data, BYTE_PER_SAMPLE, 1, frame_rate, SAMPLE_RATE, None)
+    
+    total_duration = len(pcm_data) / (SAMPLE_RATE * BYTE_PER_SAMPLE)
+    logger.info(f"Total audio file:")
+    logger.info(f"  - Duration: {total_duration:.3f} seconds")
+    
+    return audioop.lin2ulaw(pcm_data, BYTE_PER_SAMPLE)
+
+def build_frame_messages(wav_path: str) -> List[str]:
+    """
+    Encode a WAV file as AUDIO_FORMAT and build the chunk messages, one frame per chunk.
+    """
+    if AUDIO_FORMAT == "ulaw":
+        ulaw_data = encode_wav_to_ulaw(wav_path)
+        logger.info(f"Total mu-law data size: {len(ulaw_data)} bytes")
+        frames = iter_ulaw_frames(ulaw_data)
+    else:
+        mp3_data = encode_wav_to_mp3(wav_path)
         logger.info(f"Total MP3 data size: {len(mp3_data)} bytes")
+        frames = iter_mp3_frames(mp3_data)
+    
+    messages = []
+    
+    # Process one frame at a time
+    for frame_data in frames:
+        # Create message
+        message = build_chunk_message(frame_data)
         
-        # Find the start of actual audio data (after metadata)
-        # MP3 sync word is 0xFF 0xFB
-        audio_start = 0
-        for i in range(len(mp3_data) - 1):
-            if mp3_data[i] == 0xFF and mp3_data[i+1] == 0xFB:
-                audio_start = i
-                break
-                
-        logger.info(f"Found audio data starting at byte {audio_start}")
+        # Log frame details
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Frame {len(messages) + 1}:")
+            logger.debug(f"  - Frame size: {len(frame_data)} bytes")
+            logger.debug(f"  - First few bytes: {frame_data[:10].hex()}")
         
-        # Calculate frame size based on average MP3 frame size
-        # For 8k bitrate, each frame is roughly 400-600 bytes
-        frame_size = 549  # Based on observed frame size from logs (Manually input)
+        messages.append(message)
         
-        # Calculate number of frames
-        total_frames = (len(mp3_data) - audio_start) // frame_size
-        logger.info(f"Will create {total_frames} chunks (one frame per chunk)")
-        logger.info(f"Remaining bytes: {len(mp3_data) - audio_start}")
+    logger.info(f"Created {len(messages)} chunks (one frame per chunk)")
         
-        frame_count = 0
+    return messages
+
+@app.on_event("startup")
+def precompute_frames():
+    """Encode the audio file once so every call only has to send the frames."""
+    try:
+        PRECOMPUTED_FRAMES[:] = build_frame_messages(WAV_MONO)
+        logger.info(f"Precomputed {len(PRECOMPUTED_FRAMES)} frames")
+    except Exception as e:
+        logger.error(f"Error in precompute_frames: {str(e)}")
+        logger.error(traceback.format_exc())
+
+async def send_chunks():
+    """
+    Send the precomputed audio chunks to clients, one audio frame per chunk.
+    """
+    frame_ms = ULAW_FRAME_MS if AUDIO_FORMAT == "ulaw" else FRAME_MS
+    try:
+        # Pace against a fixed schedule so late wake-ups do not accumulate
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         
-        # Process one frame at a time
-        for i in range(audio_start, len(mp3_data), frame_size):
-            # Extract one frame of MP3 data
-            frame_data = mp3_data[i:i + frame_size]
-            
-            # Skip empty frames
-            if len(frame_data) == 0:
-                continue
-                
-            # Create message
-            message = {
-                "event": "chunk",
-                "media": {
-                    "payload": base64.b64encode(frame_data).decode('utf-8'),
-                    "is_sync": True
-                }
-            }
-            
-            # Log frame details
-            logger.info(f"Frame {frame_count + 1}/{total_frames}:")
-            logger.info(f"  - Start byte: {i}")
-            logger.info(f"  - Frame size: {len(frame_data)} bytes")
-            logger.info(f"  - First few bytes: {frame_data[:10].hex()}")
-            
-            await send_payload_to_clients(message, 'json')
-            
-            # Sleep for half a frame duration
-            await asyncio.sleep(FRAME_MS / 2000.0)
-            
-            frame_count += 1
-            
-        # Send any remaining data as the last frame
-        remaining_data = mp3_data[audio_start + (frame_count * frame_size):]
-        if len(remaining_data) > 0:
-            message = {
-                "event": "chunk",
-                "media": {
-                    "payload": base64.b64encode(remaining_data).decode('utf-8'),
-                    "is_sync": True
-                }
-            }
-            
-            logger.info(f"Final frame:")
-            logger.info(f"  - Start byte: {audio_start + (frame_count * frame_size)}")
-            logger.info(f"  - Frame size: {len(remaining_data)} bytes")
-            logger.info(f"  - First few bytes: {remaining_data[:10].hex()}")
+        for message in PRECOMPUTED_FRAMES:
+            await send_payload_to_clients(message, 'text')
             
-            await send_payload_to_clients(message, 'json')
-            frame_count += 1
+            # Sleep until the next frame is due
+            deadline += frame_ms / 1000.0
+            sleep_for = deadline - loop.time()
+            if sleep_for > 0:
+                await asyncio.sleep(sleep_for)
             
-        logger.info(f"Sent {frame_count} frames")
+        logger.info(f"Sent {len(PRECOMPUTED_FRAMES)} frames")
 
     except Exception as e:
         logger.error(f"Error in send_chunks: {str(e)}")
@@ -179,13 +342,15 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info("Socket connected.")
 
     # Parse client type from query parameters
-    query_params = parse_qs(urlparse(websocket.scope["query_string"].decode()).query)
-    client_type = query_params.get("clientType", ["player"])[0]
+    client_type = websocket.query_params.get("clientType", "player")
     logger.info(f"Client type: {client_type}")
 
     # Register client or server
+    pump_task = None
     if client_type == "player":
-        clients.add(websocket)
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        clients[websocket] = queue
+        pump_task = asyncio.create_task(pump_client(websocket, queue))
     elif client_type == "server":
         servers.add(websocket)
 
@@ -215,8 +380,11 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Error: {e}")
     finally:
-        clients.discard(websocket)
+        clients.pop(websocket, None)
         servers.discard(websocket)
+        if pump_task is not None:
+            pump_task.cancel()
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8888)
\ No newline at end of file
+    # MP3 payloads are already compressed, permessage-deflate gains little for its CPU cost
+    uvicorn.run(app, host="0.0.0.0", port=8888, ws_per_message_deflate=False)
\ No newline at end of file
@@ -1,8 +1,11 @@
 import traceback
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from websockets.exceptions import ConnectionClosed
-from urllib.parse import urlparse, parse_qs
-import base64
+# pybase64 is a SIMD-accelerated drop-in for the stdlib base64 module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 import json
 import asyncio
 from pathlib import Path
@@ -81,8 +84,7 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info("Socket connected.")
 
     # Parse client type from query parameters
-    query_params = parse_qs(urlparse(websocket.scope["query_string"].decode()).query)
-    client_type = query_params.get("clientType", ["player"])[0]
+    client_type = websocket.query_params.get("clientType", "player")
     logger.info(f"Client type: {client_type}")
 
     # Register client or server
@@ -147,7 +149,7 @@ async def send_media(file_name="audio/woman_4.wav"):
         message = {
             "event": "media",
             "media": {
-                "payload": base64.b64encode(audio_data).decode(),
+                "payload": base64.b64encode(audio_data).decode('ascii'),
                 "is_sync": True
             }
         }
@@ -199,7 +201,7 @@ async def send_chunks(chunk_size=BYTES_CHUNK):
             message = {
                 "event": "chunk", 
                 "media": {
-                    "payload": base64.b64encode(buffer.getvalue()).decode('utf-8'),
+                    "payload": base64.b64encode(buffer.getvalue()).decode('ascii'),
                     "is_sync": True 
                 }
             }
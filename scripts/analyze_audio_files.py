@@ -16,8 +16,15 @@ import sys
 import wave
 import argparse
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
+
+# soundfile parses headers in C (libsndfile) and also reads non-PCM WAV files
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -28,21 +35,71 @@ sys.path.insert(0, str(PROJECT_ROOT / "src"))
 # Default audio directory
 DEFAULT_AUDIO_DIR = os.path.join(PROJECT_ROOT, "audio")
 
+# Number of files whose headers are read concurrently
+MAX_WORKERS = 16
+
+# Bit depth of the libsndfile subtypes found in WAV files, coded formats
+# are given by the size of a coded sample. Other subtypes are reported as
+# unknown.
+SUBTYPE_BIT_DEPTHS = {
+    "PCM_U8": 8,
+    "PCM_S8": 8,
+    "PCM_16": 16,
+    "PCM_24": 24,
+    "PCM_32": 32,
+    "FLOAT": 32,
+    "DOUBLE": 64,
+    "ULAW": 8,
+    "ALAW": 8,
+    "IMA_ADPCM": 4,
+    "MS_ADPCM": 4,
+}
+
 
-def get_audio_info(file_path: str) -> Dict[str, Any]:
+def get_audio_info(file_path: str, file_stats: Optional[os.stat_result] = None) -> Dict[str, Any]:
     """
     Get detailed audio file information.
     
     Args:
         file_path: Path to the audio file
+        file_stats: Stat result for the file, if already known
         
     Returns:
         Dictionary with audio file information
     """
-    file_stats = os.stat(file_path)
+    if file_stats is None:
+        file_stats = os.stat(file_path)
     file_size = file_stats.st_size
     file_size_mb = file_size / (1024 * 1024)
     
+    if sf is not None:
+        try:
+            info = sf.info(file_path)
+            duration = info.duration
+            
+            # Calculate average bitrate
+            bitrate = (file_size * 8) / (duration * 1000) if duration > 0 else 0
+            
+            return {
+                "channels": info.channels,
+                "sample_rate": info.samplerate,
+                "bit_depth": SUBTYPE_BIT_DEPTHS.get(info.subtype),
+                "frames": info.frames,
+                "duration": duration,
+                "file_size": file_size,
+                "file_size_mb": file_size_mb,
+                "compression_type": info.subtype,
+                "compression_name": info.subtype_info,
+                "bitrate": bitrate,
+                "error": None
+            }
+        except Exception as e:
+            return {
+                "error": str(e),
+                "file_size": file_size,
+                "file_size_mb": file_size_mb
+            }
+    
     try:
         with wave.open(file_path, 'rb') as wav:
             channels = wav.getnchannels()
@@ -78,30 +135,45 @@ def get_audio_info(file_path: str) -> Dict[str, Any]:
         }
 
 
-def find_audio_files(audio_dir: str, recursive: bool = False) -> List[str]:
+def scan_audio_files(audio_dir: str, recursive: bool = False) -> Iterator[os.DirEntry]:
     """
-    Find all WAV files in the audio directory.
+    Yield directory entries for the WAV files in the audio directory.
     
     Args:
         audio_dir: Path to the audio directory
         recursive: Whether to search recursively in subdirectories
         
-    Returns:
-        List of paths to WAV files
+    Yields:
+        Directory entries for WAV files. Their type comes from the directory
+        listing, but on Linux DirEntry.stat() still makes one stat call.
     """
-    wav_files = []
+    # Like os.walk, skip unreadable directories and don't follow symlinks to
+    # directories, which could loop or list the same files twice
+    try:
+        entries = os.scandir(audio_dir)
+    except OSError:
+        return
     
-    if recursive:
-        for root, _, files in os.walk(audio_dir):
-            for file in files:
-                if file.lower().endswith('.wav'):
-                    wav_files.append(os.path.join(root, file))
-    else:
-        for file in os.listdir(audio_dir):
-            if file.lower().endswith('.wav'):
-                wav_files.append(os.path.join(audio_dir, file))
+    with entries:
+        for entry in entries:
+            if recursive and entry.is_dir(follow_symlinks=False):
+                yield from scan_audio_files(entry.path, recursive)
+            elif entry.is_file() and entry.name.lower().endswith('.wav'):
+                yield entry
+
+
+def find_audio_files(audio_dir: str, recursive: bool = False) -> List[os.DirEntry]:
+    """
+    Find all WAV files in the audio directory.
     
-    return sorted(wav_files)
+    Args:
+        audio_dir: Path to the audio directory
+        recursive: Whether to search recursively in subdirectories
+        
+    Returns:
+        Directory entries for WAV files, sorted by path
+    """
+    return sorted(scan_audio_files(audio_dir, recursive), key=lambda entry: entry.path)
 
 
 def print_audio_info(info: Dict[str, Any], file_path: str, verbose: bool = False) -> None:
@@ -121,7 +193,7 @@ def print_audio_info(info: Dict[str, Any], file_path: str, verbose: bool = False
     print(f"\n{'-' * 60}")
     print(f"File: {os.path.basename(file_path)}")
     print(f"Sample Rate: {info['sample_rate']} Hz")
-    print(f"Bit Depth: {info['bit_depth']} bit")
+    print(f"Bit Depth: {info['bit_depth']} bit" if info['bit_depth'] else "Bit Depth: unknown")
     print(f"Channels: {info['channels']} ({'Stereo' if info['channels'] == 2 else 'Mono'})")
     print(f"Duration: {info['duration']:.2f} seconds")
     print(f"Size: {info['file_size_mb']:.2f} MB")
@@ -164,30 +236,34 @@ def analyze_directory(audio_dir: str, recursive: bool = False,
         limit: Maximum number of files to analyze
         verbose: Whether to print detailed information
     """
-    wav_files = find_audio_files(audio_dir, recursive)
+    wav_entries = find_audio_files(audio_dir, recursive)
     
-    if not wav_files:
+    if not wav_entries:
         print(f"No WAV files found in {audio_dir}")
         return
     
-    print(f"Found {len(wav_files)} WAV files" + 
-          (f" (showing {limit})" if limit and limit < len(wav_files) else ""))
+    print(f"Found {len(wav_entries)} WAV files" + 
+          (f" (showing {limit})" if limit and limit < len(wav_entries) else ""))
     
     if limit:
-        wav_files = wav_files[:limit]
+        wav_entries = wav_entries[:limit]
     
     # Print header
     print("\nAUDIO FILE ANALYSIS")
     print("===================")
     
-    # Process each file
-    for file_path in wav_files:
-        analyze_audio_file(file_path, verbose)
+    # Read the file headers concurrently, then print them in order. The stat
+    # call behind entry.stat() runs in the pool too.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        infos = list(executor.map(lambda entry: get_audio_info(entry.path, entry.stat()), wav_entries))
+    
+    for entry, info in zip(wav_entries, infos):
+        print_audio_info(info, entry.path, verbose)
     
     # Print summary
     print("\nSUMMARY")
     print("=======")
-    print(f"Total files analyzed: {len(wav_files)}")
+    print(f"Total files analyzed: {len(wav_entries)}")
 
 
 def main():
@@ -6,14 +6,27 @@ This script converts mono WAV files to stereo 16-bit PCM format at 8000Hz
 to ensure compatibility with the Sentech PSR service requirements.
 """
 
+import asyncio
+import itertools
+import json
+import mmap
 import os
+import struct
 import sys
 import wave
-import tempfile
-import shutil
+import numpy as np
 from pathlib import Path
+import shutil
 import subprocess
-from typing import List, Dict, Any
+from enum import Enum
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+# soundfile (libsndfile) and soxr resample in-process, without spawning ffmpeg
+try:
+    import soundfile as sf
+    import soxr
+except ImportError:
+    sf = soxr = None
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -30,6 +43,109 @@ TARGET_SAMPLE_RATE = 8000  # PSR requires 16000Hz
 TARGET_CHANNELS = 2  # Stereo
 TARGET_BIT_DEPTH = 16  # 16-bit PCM
 
+# Records the source files already converted, in the destination directory.
+# Changing the target specifications invalidates it.
+MANIFEST_NAME = ".converted.json"
+TARGET_SPEC_VERSION = f"{TARGET_SAMPLE_RATE}-{TARGET_CHANNELS}-{TARGET_BIT_DEPTH}"
+
+# Maximum number of files converted by a single ffmpeg run
+BATCH_SIZE = 32
+
+# WAV "fmt " chunk format tag for plain integer PCM
+WAVE_FORMAT_PCM = 1
+
+# Bytes read to find the "fmt " and "data" chunks, enough for the LIST/INFO
+# and other small chunks some tools write between them
+HEADER_READ_SIZE = 4096
+
+
+class FileStatus(Enum):
+    """Outcome of processing a single audio file."""
+    CONVERTED = "converted"
+    SKIPPED = "skipped"
+    ERROR = "error"
+
+
+# Output directories already created by this process
+_created_dirs = set()
+
+# Outcome of a file, its messages and the [mtime_ns, size] of its source
+# once the output is in the target format
+FileResult = Tuple[FileStatus, List[str], Optional[List[int]]]
+
+
+def _needs_conversion(sample_rate: int, channels: int, bit_depth: int) -> bool:
+    """Return True if the format differs from the target specifications."""
+    return (
+        sample_rate != TARGET_SAMPLE_RATE or 
+        channels != TARGET_CHANNELS or 
+        bit_depth != TARGET_BIT_DEPTH
+    )
+
+
+def _fast_wav_header(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the format of a WAV file from its first HEADER_READ_SIZE bytes.
+    
+    A single read covers the RIFF header and the chunks up to "data",
+    which are walked in place without opening the file through wave.
+    
+    Args:
+        file_path: Path to the audio file
+        
+    Returns:
+        Dictionary with channels, sample rate, bit depth and needs_conversion,
+        plus frames, duration, data_offset and data_size when the "data"
+        chunk starts within the read, or None if no plain PCM "fmt " chunk
+        was found there
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(HEADER_READ_SIZE)
+    except OSError:
+        return None
+    
+    if len(header) < 12 or header[0:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None
+    
+    info = None
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id = header[offset:offset + 4]
+        chunk_size = struct.unpack_from('<I', header, offset + 4)[0]
+        body = offset + 8
+        
+        if chunk_id == b'fmt ':
+            if chunk_size < 16 or body + 16 > len(header):
+                return None
+            audio_format, channels, sample_rate, _, block_align, bit_depth = struct.unpack_from('<HHIIHH', header, body)
+            if audio_format != WAVE_FORMAT_PCM or sample_rate == 0 or block_align == 0:
+                return None
+            
+            info = {
+                "channels": channels,
+                "sample_rate": sample_rate,
+                "bit_depth": bit_depth,
+                "needs_conversion": _needs_conversion(sample_rate, channels, bit_depth)
+            }
+        elif chunk_id == b'data':
+            if info is None:
+                return None  # No format before the samples
+            
+            frames = chunk_size // block_align
+            info.update({
+                "frames": frames,
+                "duration": frames / sample_rate,
+                "data_offset": body,
+                "data_size": chunk_size
+            })
+            break
+        
+        # Chunks are padded to an even size
+        offset = body + chunk_size + (chunk_size & 1)
+    
+    return info
+
 
 def get_audio_info(file_path: str) -> Dict[str, Any]:
     """
@@ -41,6 +157,11 @@ def get_audio_info(file_path: str) -> Dict[str, Any]:
     Returns:
         Dictionary with audio file information
     """
+    header_info = _fast_wav_header(file_path)
+    if header_info is not None:
+        return header_info
+    
+    # Fall back to the wave module for layouts the header parse does not cover
     try:
         with wave.open(file_path, 'rb') as wav:
             channels = wav.getnchannels()
@@ -55,112 +176,477 @@ def get_audio_info(file_path: str) -> Dict[str, Any]:
                 "bit_depth": bit_depth,
                 "frames": frames,
                 "duration": duration,
-                "needs_conversion": (
-                    sample_rate != TARGET_SAMPLE_RATE or 
-                    channels != TARGET_CHANNELS or 
-                    bit_depth != TARGET_BIT_DEPTH
-                )
+                "needs_conversion": _needs_conversion(sample_rate, channels, bit_depth)
             }
     except Exception as e:
-        print(f"Error reading audio file {file_path}: {e}")
         return {
             "error": str(e),
             "needs_conversion": True  # Assume it needs conversion on error
         }
 
 
-def convert_to_stereo(input_path: str, output_path: str) -> bool:
+def _fast_mono_to_stereo(input_path: str, output_path: str,
+                         audio_info: Dict[str, Any]) -> None:
+    """
+    Duplicate the channel of a mono 16-bit WAV file into a stereo WAV file.
+    
+    Only valid when the input is already at the target sample rate and bit
+    depth, so no resampling or format conversion is needed.
+    
+    Args:
+        input_path: Path to the input audio file
+        output_path: Path to save the converted audio file
+        audio_info: Result of get_audio_info for the input file
+    """
+    data_offset = audio_info.get("data_offset")
+    
+    if data_offset is None:
+        # The "data" chunk was not located by the header parse
+        with wave.open(input_path, 'rb') as wav:
+            stereo = np.repeat(np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2'), 2)
+    else:
+        # Read the samples straight from the page cache instead of copying
+        # them into a bytes object first
+        with open(input_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Files cut short may declare more data than they hold
+            count = min(audio_info["data_size"], len(mm) - data_offset) // 2
+            mono = np.frombuffer(mm, dtype='<i2', count=count, offset=data_offset)
+            
+            # Interleave each sample into the left and right channels
+            stereo = np.repeat(mono, 2)
+            del mono  # Release the view so the mapping can be closed
+    
+    with wave.open(output_path, 'wb') as out:
+        out.setnchannels(TARGET_CHANNELS)
+        out.setsampwidth(TARGET_BIT_DEPTH // 8)
+        out.setframerate(TARGET_SAMPLE_RATE)
+        out.writeframes(stereo)
+
+
+def _resample_to_stereo(input_path: str, output_path: str) -> None:
+    """
+    Convert an audio file to the target specifications in-process.
+    
+    Like the ffmpeg conversion, the first channel of the input is used for
+    both stereo channels.
+    
+    Args:
+        input_path: Path to the input audio file
+        output_path: Path to save the converted audio file
+    """
+    data, sample_rate = sf.read(input_path, dtype='float32', always_2d=True)
+    mono = data[:, 0]
+    
+    if sample_rate != TARGET_SAMPLE_RATE:
+        mono = soxr.resample(mono, sample_rate, TARGET_SAMPLE_RATE, quality='HQ')
+    
+    stereo = np.repeat(mono[:, np.newaxis], TARGET_CHANNELS, axis=1)
+    sf.write(output_path, stereo, TARGET_SAMPLE_RATE, subtype='PCM_16', format='WAV')
+
+
+def _ensure_dir(dir_path: str) -> None:
+    """Create a directory if needed, calling os.makedirs once per directory per process."""
+    if dir_path not in _created_dirs:
+        os.makedirs(dir_path, exist_ok=True)
+        _created_dirs.add(dir_path)
+
+
+def _is_target_mono(audio_info: Optional[Dict[str, Any]]) -> bool:
+    """Return True for mono input already at the target sample rate and bit depth."""
+    return bool(
+        audio_info and
+        audio_info.get("sample_rate") == TARGET_SAMPLE_RATE and
+        audio_info.get("channels") == 1 and
+        audio_info.get("bit_depth") == TARGET_BIT_DEPTH
+    )
+
+
+def _temp_path(output_path: str) -> str:
+    """Return the temporary file a conversion writes before renaming it to output_path."""
+    return f"{output_path}.{os.getpid()}.tmp"
+
+
+def _ffmpeg_command(files: List[Tuple[str, str]]) -> List[str]:
+    """
+    Build one ffmpeg command converting each input file to its output file.
+    
+    Args:
+        files: (input_path, output_path) pairs, output i is mapped from input i
+        
+    Returns:
+        ffmpeg command line
+    """
+    cmd = [
+        "ffmpeg",
+        "-loglevel", "error",  # Only report errors, on stderr
+        "-hide_banner",
+        "-nostats",
+        "-filter_threads", "1",  # Global option, filter graph threads
+        "-y",  # Overwrite output files
+    ]
+    
+    # -threads 1: files are converted in parallel, so keep each ffmpeg on one core
+    # -probesize/-analyzeduration: the WAV header gives the stream parameters,
+    # so don't read ahead into the samples to guess them
+    for input_path, _ in files:
+        cmd += [
+            "-probesize", "32",
+            "-analyzeduration", "0",
+            "-threads", "1",  # Decoder threads
+            "-i", input_path
+        ]
+    
+    # -ac 2: convert to stereo
+    # -af "channelmap=...": copy the first input channel to both stereo channels,
+    # a plain channel copy rather than pan's mixing matrix
+    for index, (_, output_path) in enumerate(files):
+        cmd += [
+            "-map", f"{index}:a:0",
+            "-ar", str(TARGET_SAMPLE_RATE),
+            "-ac", str(TARGET_CHANNELS),
+            "-sample_fmt", "s16",  # 16-bit signed PCM
+            "-af", "channelmap=map=0-FL|0-FR:channel_layout=stereo",  # Duplicate mono to both channels
+            "-threads", "1",  # Encoder threads
+            "-map_metadata", "-1",  # Don't copy tags from the input
+            "-fflags", "+bitexact",  # No LIST/INFO encoder chunk
+            "-flags", "+bitexact",
+            "-f", "wav",  # The temp file extension does not name the format
+            output_path
+        ]
+    return cmd
+
+
+async def convert_to_stereo(input_path: str, output_path: str, messages: List[str],
+                            audio_info: Optional[Dict[str, Any]] = None) -> bool:
     """
     Convert a mono audio file to stereo format with target specifications.
     
     Args:
         input_path: Path to the input audio file
         output_path: Path to save the converted audio file
+        messages: Progress messages of the file, errors are appended to it
+        audio_info: Result of get_audio_info for the input file, if known
         
     Returns:
         True if conversion succeeded, False otherwise
     """
+    # Write next to the output and rename it into place once complete, a
+    # rename on the same filesystem copies no data and is atomic
+    temp_output = _temp_path(output_path)
+    
     try:
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(output_path))
         
-        # Create a temporary directory for the operation
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_output = os.path.join(temp_dir, "converted.wav")
-            
-            # Use ffmpeg to convert the audio
-            # -ac 2: convert to stereo
-            # -af "pan=stereo|c0=c0|c1=c0": duplicate mono channel to both stereo channels
-            cmd = [
-                "ffmpeg",
-                "-i", input_path,
-                "-ar", str(TARGET_SAMPLE_RATE),
-                "-ac", str(TARGET_CHANNELS),
-                "-sample_fmt", "s16",  # 16-bit signed PCM
-                "-af", "pan=stereo|c0=c0|c1=c0",  # Duplicate mono to both channels
-                "-y",  # Overwrite output files
-                temp_output
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print(f"Error converting {input_path}: {result.stderr}")
-                return False
-                
-            # Move the temp file to the destination
-            shutil.copy2(temp_output, output_path)
+        # Mono input already at the target rate and depth only needs its
+        # channel duplicated, which is done in-process without ffmpeg
+        if _is_target_mono(audio_info):
+            await asyncio.to_thread(_fast_mono_to_stereo, input_path, temp_output, audio_info)
+            os.replace(temp_output, output_path)
             return True
+        
+        # Otherwise resample in-process when possible, inputs soundfile
+        # cannot read still go through ffmpeg
+        if sf is not None:
+            try:
+                await asyncio.to_thread(_resample_to_stereo, input_path, temp_output)
+                os.replace(temp_output, output_path)
+                return True
+            except Exception as e:
+                messages.append(f"  In-process conversion of {input_path} failed, using ffmpeg: {e}")
+        
+        # Use ffmpeg to convert the audio
+        proc = await asyncio.create_subprocess_exec(
+            *_ffmpeg_command([(input_path, temp_output)]),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        _, stderr = await proc.communicate()
+        
+        if proc.returncode != 0:
+            error = stderr.decode('utf-8', 'replace').strip().replace('\n', '\n    ')
+            messages.append(f"  Error converting {input_path}: {error}")
+            return False
+            
+        # Move the temp file to the destination
+        os.replace(temp_output, output_path)
+        return True
             
     except Exception as e:
-        print(f"Error during conversion: {e}")
+        messages.append(f"  Error during conversion: {e}")
         return False
+    finally:
+        # Only left behind if the conversion failed
+        if os.path.exists(temp_output):
+            os.unlink(temp_output)
 
 
-def find_all_audio_files(audio_dir: str) -> List[str]:
+async def convert_batch_to_stereo(files: List[Tuple[str, str]]) -> bool:
+    """
+    Convert several audio files with a single ffmpeg run.
+    
+    Starting ffmpeg costs more than converting a short clip, so one process
+    handles the whole batch. If any file fails, no output is written.
+    
+    Args:
+        files: (input_path, output_path) pairs
+        
+    Returns:
+        True if every file was converted, False otherwise
+    """
+    temp_outputs = [_temp_path(output_path) for _, output_path in files]
+    
+    try:
+        for _, output_path in files:
+            _ensure_dir(os.path.dirname(output_path))
+        
+        cmd = _ffmpeg_command([(input_path, temp_output)
+                               for (input_path, _), temp_output in zip(files, temp_outputs)])
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL  # Failed batches are retried per file
+        )
+        if await proc.wait() != 0:
+            return False
+        
+        for (_, output_path), temp_output in zip(files, temp_outputs):
+            os.replace(temp_output, output_path)
+        return True
+    
+    except Exception:
+        return False  # Failed batches are retried per file, which reports the error
+    finally:
+        for temp_output in temp_outputs:
+            if os.path.exists(temp_output):
+                os.unlink(temp_output)
+
+
+def _scan_wav_files(dir_path: str, prefix_len: int) -> Iterator[Tuple[str, str]]:
+    """Recursively yield (path, path[prefix_len:]) for the WAV files under dir_path."""
+    # Like os.walk, skip unreadable directories and don't follow symlinks to
+    # directories, which could loop or reach the same files twice
+    try:
+        entries = os.scandir(dir_path)
+    except OSError:
+        return
+    
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan_wav_files(entry.path, prefix_len)
+            elif entry.is_file() and entry.name.lower().endswith('.wav'):
+                yield entry.path, entry.path[prefix_len:]
+
+
+def find_all_audio_files(audio_dir: str) -> Iterator[Tuple[str, str]]:
     """
     Find all WAV files in the audio directory.
     
+    Files are yielded as they are found, so conversion can start before the
+    whole tree has been walked.
+    
     Args:
         audio_dir: Path to the audio directory
         
+    Yields:
+        Full and relative paths to WAV files
+    """
+    # Entry paths all start with audio_dir and a separator, so relative
+    # paths are a slice instead of an os.path.relpath call
+    yield from _scan_wav_files(audio_dir, len(audio_dir.rstrip(os.sep)) + 1)
+
+
+def _batches(items: Iterable[Tuple[str, str]]) -> Iterator[List[Tuple[str, str]]]:
+    """
+    Group items into batches that double in size up to BATCH_SIZE.
+    
+    Small first batches fill every conversion slot quickly and keep small
+    trees spread across the slots, larger later ones amortize ffmpeg startup.
+    """
+    items = iter(items)
+    batch_size = 1
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+        batch_size = min(batch_size * 2, BATCH_SIZE)
+
+
+def _file_version(file_path: str) -> Optional[List[int]]:
+    """Return [mtime_ns, size] for a file, or None if it cannot be stat'ed."""
+    try:
+        file_stats = os.stat(file_path)
+    except OSError:
+        return None
+    return [file_stats.st_mtime_ns, file_stats.st_size]
+
+
+def _load_manifest(dest_dir: str) -> Dict[str, List[int]]:
+    """
+    Load the versions of the source files converted by previous runs.
+    
+    Args:
+        dest_dir: Path to the destination audio directory
+        
     Returns:
-        List of relative paths to WAV files
+        Mapping of relative path to the [mtime_ns, size] of the source file
+        that was converted, empty if there is no manifest for the current
+        target specifications
+    """
+    try:
+        with open(os.path.join(dest_dir, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if not isinstance(manifest, dict) or manifest.get("target") != TARGET_SPEC_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def _save_manifest(dest_dir: str, files: Dict[str, List[int]]) -> None:
+    """
+    Write the manifest of converted source files atomically.
+    
+    Args:
+        dest_dir: Path to the destination audio directory
+        files: Mapping of relative path to [mtime_ns, size] of the source file
     """
-    wav_files = []
-    for root, dirs, files in os.walk(audio_dir):
-        for file in files:
-            if file.lower().endswith('.wav'):
-                rel_path = os.path.relpath(os.path.join(root, file), audio_dir)
-                wav_files.append(rel_path)
-    return wav_files
+    manifest_path = os.path.join(dest_dir, MANIFEST_NAME)
+    temp_path = _temp_path(manifest_path)
+    with open(temp_path, 'w') as f:
+        json.dump({"target": TARGET_SPEC_VERSION, "files": files}, f)
+    os.replace(temp_path, manifest_path)
 
 
-def convert_audio_files(source_dir: str, dest_dir: str) -> bool:
+def _changed_audio_files(source_dir: str, dest_dir: str, manifest: Dict[str, List[int]],
+                         unchanged: List[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yield the WAV files that are not recorded as converted in the manifest.
+    
+    Files whose source is unchanged since it was converted, and whose output
+    still exists, are reported as skipped without opening either file.
+    
+    Args:
+        source_dir: Path to the source audio directory
+        dest_dir: Path to the destination audio directory
+        manifest: Result of _load_manifest
+        unchanged: List the relative paths of skipped files are appended to
+        
+    Yields:
+        Full and relative paths to WAV files that need to be inspected
+    """
+    dest_prefix = dest_dir.rstrip(os.sep) + os.sep
+    for input_path, rel_path in find_all_audio_files(source_dir):
+        version = manifest.get(rel_path)
+        if (version is not None and
+                version == _file_version(input_path) and
+                os.path.exists(dest_prefix + rel_path)):
+            print(f"Skipping {rel_path} (unchanged since it was converted)")
+            unchanged.append(rel_path)
+            continue
+        yield input_path, rel_path
+
+
+def _conversion_result(converted: bool, input_path: str, output_path: str,
+                       messages: List[str]) -> FileResult:
+    """Return the outcome of a conversion together with its messages."""
+    if not converted:
+        return FileStatus.ERROR, messages, None
+    
+    messages.append(f"  Converted to stereo: {output_path}")
+    messages.append(f"  Output format: {TARGET_SAMPLE_RATE}Hz, {TARGET_CHANNELS} channels, {TARGET_BIT_DEPTH}-bit PCM")
+    return FileStatus.CONVERTED, messages, _file_version(input_path)
+
+
+async def _process_batch(files: List[Tuple[str, str]], dest_dir: str) -> List[Tuple[str, FileResult]]:
+    """
+    Convert a batch of WAV files, skipping those already in the target format.
+    
+    Files that need ffmpeg are converted by one ffmpeg run for the whole
+    batch; if that run fails they are retried one by one so the failing
+    files are reported individually.
+    
+    Batches run concurrently, so progress messages are returned to the caller
+    instead of printed, which keeps the output of each file together.
+    
+    Args:
+        files: Full and relative paths of the WAV files
+        dest_dir: Path to the destination audio directory
+        
+    Returns:
+        Each relative path with its outcome, the messages to print for it and
+        the version of its source file if the output is now correct, in
+        input order
+    """
+    results = {}
+    pending = []  # (rel_path, input_path, output_path, messages) for ffmpeg
+    
+    dest_prefix = dest_dir.rstrip(os.sep) + os.sep
+    
+    for input_path, rel_path in files:
+        output_path = dest_prefix + rel_path
+        
+        messages = [f"Processing {rel_path}..."]
+        
+        # Check if output file exists and is already in the correct format,
+        # before the input is opened at all
+        if os.path.exists(output_path):
+            output_info = get_audio_info(output_path)
+            if not output_info.get("needs_conversion", True):
+                results[rel_path] = FileStatus.SKIPPED, [
+                    f"Skipping {rel_path} (output file already exists and is in correct format)"
+                ], _file_version(input_path)
+                continue
+            if output_info.get("error"):
+                messages.append(f"  Error reading audio file {output_path}: {output_info['error']}")
+        
+        # Get audio info
+        audio_info = get_audio_info(input_path)
+        if audio_info.get("error"):
+            messages.append(f"  Error reading audio file {input_path}: {audio_info['error']}")
+        
+        messages.append(
+            f"  Input format: {audio_info.get('sample_rate', 'unknown')}Hz, "
+            f"{audio_info.get('channels', 'unknown')} channel(s), "
+            f"{audio_info.get('bit_depth', 'unknown')}-bit"
+        )
+        
+        # Without ffmpeg, or when ffmpeg is only a fallback, convert right away
+        if _is_target_mono(audio_info) or sf is not None:
+            converted = await convert_to_stereo(input_path, output_path, messages, audio_info)
+            results[rel_path] = _conversion_result(converted, input_path, output_path, messages)
+        else:
+            pending.append((rel_path, input_path, output_path, messages))
+    
+    # Convert the rest with one ffmpeg run, or one per file if that fails
+    batch_converted = len(pending) > 1 and await convert_batch_to_stereo(
+        [(input_path, output_path) for _, input_path, output_path, _ in pending]
+    )
+    for rel_path, input_path, output_path, messages in pending:
+        converted = batch_converted or await convert_to_stereo(input_path, output_path, messages)
+        results[rel_path] = _conversion_result(converted, input_path, output_path, messages)
+    
+    return [(rel_path, results[rel_path]) for _, rel_path in files]
+
+
+async def convert_audio_files(source_dir: str, dest_dir: str, workers: Optional[int] = None) -> bool:
     """
     Convert all mono audio files to stereo format.
     
     Args:
         source_dir: Path to the source audio directory
         dest_dir: Path to the destination audio directory
+        workers: Number of batches converted at once (default: number of CPUs)
         
     Returns:
         True if all files were processed successfully, False otherwise
     """
-    # Check if ffmpeg is installed
-    try:
-        subprocess.run(
-            ["ffmpeg", "-version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-    except Exception:
+    # Check if ffmpeg is installed, it is only a fallback when soundfile is
+    if shutil.which("ffmpeg") is None and sf is None:
         print("Error: ffmpeg is not installed or not in the PATH.")
         print("Please install ffmpeg and try again.")
         return False
@@ -168,50 +654,78 @@ def convert_audio_files(source_dir: str, dest_dir: str) -> bool:
     # Ensure destination directory exists
     os.makedirs(dest_dir, exist_ok=True)
     
-    # Find all WAV files
-    wav_files = find_all_audio_files(source_dir)
-    print(f"Found {len(wav_files)} WAV files to process")
+    # Source files converted by previous runs are skipped without inspection
+    manifest = _load_manifest(dest_dir)
+    unchanged = []
     
-    # Process each file
-    success_count = 0
-    skipped_count = 0
-    error_count = 0
+    counts = {status: 0 for status in FileStatus}
+    failures = []  # Exceptions raised by batches, re-raised once all are done
     
-    for rel_path in wav_files:
-        input_path = os.path.join(source_dir, rel_path)
-        output_path = os.path.join(dest_dir, rel_path)
-        
-        # Get audio info
-        audio_info = get_audio_info(input_path)
+    def record(task: asyncio.Task) -> None:
+        """Print the messages of a finished batch and record its outcomes."""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            failures.append(task.exception())
+            return
         
-        # Check if output file exists and is already in the correct format
-        if os.path.exists(output_path):
-            output_info = get_audio_info(output_path)
-            if not output_info.get("needs_conversion", True):
-                print(f"Skipping {rel_path} (output file already exists and is in correct format)")
-                skipped_count += 1
-                continue
-        
-        print(f"Processing {rel_path}...")
-        print(f"  Input format: {audio_info.get('sample_rate', 'unknown')}Hz, "
-              f"{audio_info.get('channels', 'unknown')} channel(s), "
-              f"{audio_info.get('bit_depth', 'unknown')}-bit")
+        for rel_path, (status, messages, version) in task.result():
+            for message in messages:
+                print(message)
+            counts[status] += 1
+            
+            # Record the source version once its output is correct
+            if version is not None:
+                manifest[rel_path] = version
+            else:
+                manifest.pop(rel_path, None)
+    
+    # Convert batches of WAV files concurrently while the tree is still being
+    # walked, each batch is independent. ffmpeg runs are awaited as
+    # subprocesses and in-process conversions run in threads, so no worker
+    # processes are needed.
+    limit = asyncio.Semaphore(workers or os.cpu_count())
+    running = set()
+    
+    async def run_batch(files: List[Tuple[str, str]]) -> List[Tuple[str, FileResult]]:
+        try:
+            return await _process_batch(files, dest_dir)
+        finally:
+            limit.release()
+    
+    try:
+        for files in _batches(_changed_audio_files(source_dir, dest_dir, manifest, unchanged)):
+            # Wait for a free slot before starting, so batches are only made
+            # as fast as they are converted
+            await limit.acquire()
+            if failures:
+                limit.release()
+                break
+            task = asyncio.create_task(run_batch(files))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(record)
         
-        # Convert the file
-        if convert_to_stereo(input_path, output_path):
-            print(f"  Converted to stereo: {output_path}")
-            print(f"  Output format: {TARGET_SAMPLE_RATE}Hz, {TARGET_CHANNELS} channels, {TARGET_BIT_DEPTH}-bit PCM")
-            success_count += 1
-        else:
-            error_count += 1
+        # Failures are collected by record, including those of batches that
+        # finished while the tree was still being walked
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        if failures:
+            raise failures[0]
+    finally:
+        # Also saved when interrupted, so finished files are not redone
+        _save_manifest(dest_dir, manifest)
+    
+    counts[FileStatus.SKIPPED] += len(unchanged)
     
     # Print summary
     print("\nSummary:")
-    print(f"  Successfully converted: {success_count}")
-    print(f"  Skipped (already correct): {skipped_count}")
-    print(f"  Errors: {error_count}")
+    print(f"  WAV files found: {sum(counts.values())}")
+    print(f"  Successfully converted: {counts[FileStatus.CONVERTED]}")
+    print(f"  Skipped (already correct): {counts[FileStatus.SKIPPED]}")
+    print(f"  Errors: {counts[FileStatus.ERROR]}")
     
-    return error_count == 0
+    return counts[FileStatus.ERROR] == 0
 
 
 def main():
@@ -219,6 +733,7 @@ def main():
     # Override with environment variables if provided
     source_dir = os.environ.get("SOURCE_AUDIO_DIR", SOURCE_AUDIO_DIR)
     dest_dir = os.environ.get("DEST_AUDIO_DIR", DEST_AUDIO_DIR)
+    workers = int(os.environ["WORKERS"]) if os.environ.get("WORKERS") else None
     
     print(f"Source audio directory (mono): {source_dir}")
     print(f"Destination audio directory (stereo): {dest_dir}")
@@ -235,7 +750,7 @@ def main():
         return False
     
     # Perform the conversion
-    return convert_audio_files(source_dir, dest_dir)
+    return asyncio.run(convert_audio_files(source_dir, dest_dir, workers))
 
 
 if __name__ == "__main__":